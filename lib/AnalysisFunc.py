@@ -1,12 +1,26 @@
 # coding: utf8
 import sys
 import FastaResFunc, shutil
-import logging, subprocess, shlex, os, ete3
-from Bio import SeqIO, AlignIO
+import logging, subprocess, shlex, os, ete3, json, re
+from Bio import AlignIO
+from Bio.Align import MultipleSeqAlignment
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
+from Bio.SeqIO.FastaIO import SimpleFastaParser
 from collections import defaultdict
+from functools import lru_cache
+from hashlib import blake2b
 from itertools import chain
-from statistics import median, mean
-import pandas as pd
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# getorf record id: gene id followed by "_" and the ORF number
+reOrfId = re.compile(r"^(.+)_[^_]*$")
 
 ######Functions=============================================================================================================
 
@@ -15,24 +29,27 @@ def cmd(commandLine, choice, verbose=False, stdout = None):
     """
     Function executing a command line in a bash terminal.
 
-    @param1 commandLine: String corresponding to a bash command line
+    @param1 commandLine: Sequence of arguments, or string corresponding to a bash command line
     @param2 choice: Boolean determining whether the command is executed within the shell
     """
     if not stdout:
       if verbose:
         out = None
       else:
-        out = subprocess.PIPE
+        out = subprocess.DEVNULL
     else:
       if stdout == subprocess.PIPE:
         out = stdout
       else:
         out = open(stdout, "w")
 
-    lCmd = shlex.split(commandLine)
+    if isinstance(commandLine, str):
+        lCmd = shlex.split(commandLine)
+    else:
+        lCmd = list(commandLine)
 
     try:
-        run = subprocess.call(lCmd, shell=choice, stdout=out, stderr=subprocess.PIPE)
+        run = subprocess.run(lCmd, shell=choice, stdout=out, stderr=subprocess.DEVNULL, check=False)
     except subprocess.CalledProcessError as err:
         sys.stderr.write(str(err))
 
@@ -67,61 +84,48 @@ def getORFs(parameters):
         )
     )
     cmd(
-        "getorf -sequence {:s} -outseq {:s} -table 0 -find 3 -noreverse".format(
-            catFile, outORFraw
-        ),
+        ("getorf", "-sequence", catFile, "-outseq", outORFraw, "-table", "0", "-find", "3", "-noreverse"),
         False,
     )
 
-    dId2ORFs = defaultdict(list)
-    f = SeqIO.parse(open(outORFraw), "fasta")
-    for fasta in f:
-        fname, fseq = fasta.id, str(fasta.seq)
-        if len(fname.split("_")) > 2:
-            fname2 = "_".join(fname.split("_")[0:-1])
-        else:
-            fname2 = fname.split("_")[0]
-        dId2ORFs[fname2].append(fseq)
-
     dId2Longest = {}
-    for k, v in dId2ORFs.items():
-        dId2Longest[k] = max(v, key=len)
-
-    # delete duplicate sequences
+    with open(outORFraw) as f:
+        for title, fseq in SimpleFastaParser(f):
+            fname = title.split()[0]
+            m = reOrfId.match(fname)
+            fname2 = m.group(1) if m else fname.partition("_")[0]
+            cur = dId2Longest.get(fname2)
+            if cur is None or len(fseq) > len(cur):  # first longest ORF is kept
+                dId2Longest[fname2] = fseq
+
+    # delete duplicate sequences, grouped on a 128-bit digest of the sequence
     dRev = {}
     for k, v in dId2Longest.items():
-        dRev.setdefault(v, set()).add(k)
+        dRev.setdefault(blake2b(v.encode(), digest_size=16).digest(), set()).add(k)
 
     AllDupl = [values for key, values in dRev.items() if len(values) > 1]
-    n = 0
+    toDelete = set()
     for dupl in AllDupl:
-        species = set([x.split("_")[0] for x in dupl])
-
-        for sp in species:
-            if queryName in dupl:
-                firstOcc = queryName
-            else:
-                lOcc = [x for x in dupl if sp in x]
+        # keep the query, or else the first sequence of each species
+        dSp2Ids = defaultdict(list)
+        for x in dupl:
+            dSp2Ids[x.split("_")[0]].append(x)
 
-                if len(lOcc) > 0:
-                    firstOcc = lOcc[0]
-                else:
-                    firstOcc = str(lOcc)
+        keep = set()
+        for sp, lIds in dSp2Ids.items():
+            keep.add(queryName if queryName in lIds else min(lIds))
+        toDelete.update(dupl - keep)
 
-            dupl.remove(firstOcc)
-
-        for i in dupl:
-            dId2Longest.pop(i, None)
-            n += 1
-            logger.debug("Deleted sequence {:s} (duplicate)".format(i))
+    n = len(toDelete)
+    for i in sorted(toDelete):
+        dId2Longest.pop(i, None)
+        logger.debug("Deleted sequence {:s} (duplicate)".format(i))
 
     logger.info("Deleted {} sequences as duplicates".format(n))
 
     outORF = outORFraw.replace("allORFs.fasta", "orf.fasta")
 
-    with open(outORF, "w") as outO:
-        outO.write(FastaResFunc.dict2fasta(dId2Longest))
-        outO.close()
+    FastaResFunc.dict2fastaFile(dId2Longest, outORF)
 
     logger.info("Extracted longest ORFs: {:s}".format(outORF))
 
@@ -149,7 +153,7 @@ def runPrank(ORFs, parameters):
 
 #    logger.debug("prank -d={:s} -o={:s} -codon -F".format(ORFs, outPrank))
 
-    cmd("prank -d={:s} -o={:s} -codon -F".format(ORFs, outPrank), False)
+    cmd(("prank", "-d=" + ORFs, "-o=" + outPrank, "-codon", "-F"), False)
 
     logger.info("Finished Prank codon alignment: {:s}.best.fas".format(outPrank))
 
@@ -171,7 +175,7 @@ def runMacse(ORFs, parameters):
     queryName = parameters["queryName"]
     outFile = outdir + "/" + queryName + "_macse"
 
-    cmd("macse -prog refineAlignment -align {:s} -out_NT {:s}.best.fas".format(ORFs, outFile),False)
+    cmd(("macse", "-prog", "refineAlignment", "-align", ORFs, "-out_NT", outFile + ".best.fas"), False)
 
     logger.info("Finished Macse codon alignment: {:s}.best.fas".format(outFile))
 
@@ -186,7 +190,7 @@ def runMafft(parameters):
 
     
     ORFs=parameters["input"]
-    cmdmafft = "mafft --auto --quiet {}".format(ORFs)
+    cmdmafft = ("mafft", "--auto", "--quiet", ORFs)
     outMafft = outdir+"/"+ queryName + "_mafft.fasta"
     cmd(cmdmafft,False,stdout=outMafft)
     # with open(outMafft, "w") as outM:
@@ -199,6 +203,30 @@ def runMafft(parameters):
     return outMafft
 
 
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, parallel=True)
+    def covKeep(mat, mask, cov):
+        """
+        Function flagging the sequences covering more than cov% of the query.
+
+        @param1 mat: 2-D uint8 array of aligned sequences (one per row)
+        @param2 mask: Boolean array of the non-indel positions of the query
+        @param3 cov: Minimal coverage (in %)
+        @return keep: Boolean array of the sequences to keep
+        """
+        nbSeq, laln = mat.shape
+        total = mask.sum()
+        keep = np.zeros(nbSeq, dtype=np.bool_)
+        for i in prange(nbSeq):
+            nongap = 0
+            for j in range(laln):
+                if mask[j] and mat[i, j] != 45:  # ord("-")
+                    nongap += 1
+            keep[i] = 100 * nongap > cov * total
+        return keep
+
+
 def covAln(aln, parameters):
     """
     Function to discard sequences from alignment according to coverage to query.
@@ -210,32 +238,41 @@ def covAln(aln, parameters):
 
     cov = parameters["mincov"]
     queryName = parameters["queryName"]
+    outdir = parameters["outdir"]
 
-    dId2Seq = {fasta.id: str(fasta.seq) for fasta in SeqIO.parse(open(aln), "fasta")}
     logger = logging.getLogger("main.alignment")
 
-    if queryName in dId2Seq:
+    # look for the query in the headers before loading the sequences
+    with open(aln) as f:
+        queryIn = any(
+            line[1:].split()[:1] == [queryName] for line in f if line.startswith(">")
+        )
+
+    if queryIn:
         logger.info(
             "Discarding sequences with less than {:d}% coverage of query.".format(cov)
         )
         outCov = outdir+"/"+ queryName + "_mincov.fasta"
-        
-        nbOut = 0
-        lIndexes = [pos for pos, char in enumerate(dId2Seq[queryName]) if char != "-"]
 
-        dKeep = {}
-        for ID, seq in dId2Seq.items():
-            seqPos = [seq[x] for x in lIndexes]
-            seqCov = (len(seqPos) - seqPos.count("-")) / len(seqPos) * 100
+        with open(aln) as f:
+            dId2Seq = {title.split()[0]: seq for title, seq in SimpleFastaParser(f)}
+
+        lId = list(dId2Seq)
+        mat = np.frombuffer(
+            b"".join(seq.encode() for seq in dId2Seq.values()), dtype=np.uint8
+        ).reshape(len(lId), -1)
+        mask = mat[lId.index(queryName)] != ord("-")
 
-            if seqCov > cov:
-                dKeep[ID] = seq
+        if NUMBA_AVAILABLE:
+            lKeep = covKeep(mat, mask, cov)
+        else:
+            nongap = np.count_nonzero(mat[:, mask] != ord("-"), axis=1)
+            lKeep = 100 * nongap > cov * np.count_nonzero(mask)
+        dKeep = {ID: dId2Seq[ID] for ID, keep in zip(lId, lKeep) if keep}
 
         nbOut = len(dId2Seq) - len(dKeep)
 
-        with open(outCov, "w") as outC:
-            outC.write(FastaResFunc.dict2fasta(dKeep))
-            outC.close()
+        FastaResFunc.dict2fastaFile(dKeep, outCov)
         logger.info("Discarded {:d} sequences".format(nbOut))
 
         return (outCov, nbOut)
@@ -247,6 +284,80 @@ def covAln(aln, parameters):
         return (aln, 0)
 
 
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True)
+    def varCols(arr):
+        """
+        Function flagging the positions holding at least two different letters (indels excluded).
+
+        @param arr: 2-D uint8 array of sequences (rows) by positions (columns)
+        @return var: Boolean array of the variable positions
+        """
+        nbRow, nbCol = arr.shape
+        var = np.zeros(nbCol, dtype=np.bool_)
+        for j in range(nbCol):
+            first = -1
+            for i in range(nbRow):
+                v = arr[i, j]
+                if v == 45:  # ord("-")
+                    continue
+                if first == -1:
+                    first = v
+                elif v != first:
+                    var[j] = True
+                    break
+        return var
+
+else:
+
+    def varCols(arr):
+        """
+        Function flagging the positions holding at least two different letters (indels excluded).
+
+        @param arr: 2-D uint8 array of sequences (rows) by positions (columns)
+        @return var: Boolean array of the variable positions
+        """
+        nogap = arr != ord("-")
+        return np.where(nogap, arr, 0).max(axis=0) > np.where(nogap, arr, 255).min(axis=0)
+
+
+def clusterRows(arr):
+    """
+    Function splitting the sequences of an alignment matrix into clusters of isoforms.
+
+    A cluster is kept as long as its sequences share the same letter or
+    an indel at each position. Where several letters occur, it is split
+    by letter, sequences with an indel forming their own cluster.
+
+    @param arr: 2-D uint8 array of sequences (rows) by positions (columns)
+    @return lGroup: List of arrays of row indexes, one per cluster
+    """
+    gap = ord("-")
+
+    # identical rows always end up together, so only cluster unique ones
+    dRow = {}
+    inv = np.array([dRow.setdefault(row.tobytes(), len(dRow)) for row in arr])
+    uniq = np.stack([np.frombuffer(row, dtype=np.uint8) for row in dRow])
+    lab = np.zeros(len(uniq), dtype=np.int64)  # cluster of each unique row
+
+    # clusters can only be split at positions where the species has several letters
+    for col in np.ascontiguousarray(uniq[:, varCols(uniq)].T):
+        nogap = col != gap
+        # number of distinct letters per cluster at this position
+        lpair = np.unique(lab[nogap] * 256 + col[nogap])
+        nlet = np.bincount(lpair // 256, minlength=len(uniq))
+        split = nlet[lab] > 1
+        if not split.any():  # one letter at most, keep all
+            continue
+        # conservative: indels of a split cluster go apart, may be improved
+        _, lab = np.unique(lab * 256 + np.where(split, col, 0), return_inverse=True)
+
+    rowLab = lab[inv]
+    _, lFirst = np.unique(rowLab, return_index=True)
+    return [np.flatnonzero(rowLab == rowLab[i]) for i in sorted(lFirst)]
+
+
 def isoformAln(aln, parameters):
     """Function to cluster isoforms according to the alignment. Return the
     overall coverage of these isoforms.
@@ -268,46 +379,30 @@ def isoformAln(aln, parameters):
 
     dRem = {}  # for remaining sequences
     dId2Seq = {}  # for remaining sequences
-    laln = 0  # alignement length
-    for fasta in SeqIO.parse(open(aln), "fasta"):
-        post = fasta.id.find("_")
-        if post != -1:  # regular format
-            sp = fasta.id[:post]
-            tag = fasta.id[post + 1 :]
-            if not sp in dId2Seq:
-                dId2Seq[sp] = {}
-            dId2Seq[sp][tag] = str(fasta.seq)
-            if laln == 0:
-                laln = len(fasta.seq)
-        else:
-            dRem[fasta.id] = str(fasta.seq)
+    with open(aln) as f:
+        for title, seq in SimpleFastaParser(f):
+            fid = title.split()[0]
+            post = fid.find("_")
+            if post != -1:  # regular format
+                sp = fid[:post]
+                tag = fid[post + 1 :]
+                if not sp in dId2Seq:
+                    dId2Seq[sp] = {}
+                dId2Seq[sp][tag] = np.frombuffer(seq.encode(), dtype=np.uint8)
+            else:
+                dRem[fid] = seq
 
     outCov = outdir + "/"  + queryName + "_clustiso.fasta"
     clustok = False  # flag to check if a cluster has occured
     for sp, dtagseq in dId2Seq.items():
-        lclust = [list(dtagseq)]  # list of clusters of tags to be split
-        for pos in range(laln):
-            lclust2 = []
-            for clust in lclust:
-                dlet = {tag: dtagseq[tag][pos] for tag in clust}
-                llet = set([x for x in dlet.values() if x != "-"])
-                if len(llet) <= 1:  # one letter at most, keep all
-                    lclust2.append(clust)
-                    continue
-                else:
-                    for x in llet:
-                        lclust2.append([tag for tag in clust if dlet[tag] == x])
-                    lind = [
-                        tag for tag in clust if dlet[tag] == "-"
-                    ]  # conservative, do not know wether to merge, may be improved
-                    if len(lind) != 0:
-                        lclust2.append(lind)
-            lclust = lclust2
+        ltag = list(dtagseq)
+        arr = np.stack([dtagseq[tag] for tag in ltag])
 
         # now merge sequences in each cluster
-        for clust in lclust:
+        for group in clusterRows(arr):
+            clust = [ltag[i] for i in group]
             if len(clust) == 1:
-                dRem[sp + "_" + clust[0]] = dtagseq[clust[0]]
+                dRem[sp + "_" + clust[0]] = arr[group[0]].tobytes().decode()
             else:
                 clustok = True
                 ntag = clust[-1] + "_clust"
@@ -319,15 +414,11 @@ def isoformAln(aln, parameters):
                     + " into %s_" % (sp)
                     + ntag
                 )
-                nseq = "".join(
-                    [max([dtagseq[tag][pos] for tag in clust]) for pos in range(laln)]
-                )
+                nseq = arr[group].max(axis=0).tobytes().decode()
                 dRem[sp + "_" + ntag] = nseq
 
     if clustok:
-        with open(outCov, "w") as outC:
-            outC.write(FastaResFunc.dict2fasta(dRem))
-            outC.close()
+        FastaResFunc.dict2fastaFile(dRem, outCov)
 
         return outCov
     else:
@@ -356,25 +447,14 @@ def runPhyML(parameters):
     # os.chdir(geneDir)
     outPhy = geneDir + "/" + queryName + "_tree.phylip"
     # aln = aln.split("/")[-1]
-    tmp = geneDir + "/" + queryName + "tree.tmp"
 
     logger = logging.getLogger("main.tree")
-    with open(aln, "rU") as aln2:
-        laln = aln2.read().replace("!", "N")
-        aln2.close()
-        with open(tmp, "w") as temp:
-            temp.write(laln)
-            temp.close()
-
-    input_handle = open(tmp, "rU")
-    output_handle = open(outPhy, "w")
-
-    alignments = AlignIO.parse(input_handle, "fasta")
-    AlignIO.write(alignments, output_handle, "phylip-relaxed")
-
-    output_handle.close()
-    input_handle.close()
-    os.remove(tmp)
+    with open(aln) as aln2:
+        alignment = MultipleSeqAlignment(
+            SeqRecord(Seq(seq.replace("!", "N")), id=title.split()[0])
+            for title, seq in SimpleFastaParser(aln2)
+        )
+    AlignIO.write(alignment, outPhy, "phylip-relaxed")
 
     phymlOpt = parameters["phymlOpt"]
     # PhyML
@@ -382,17 +462,17 @@ def runPhyML(parameters):
         try:
             opt = phymlOpt.split("ALN ")[1]
             logger.debug("phyml -i {:s} {}".format(outPhy, opt))
-            cmd("phyml --quiet -i {:s} {}".format(outPhy, opt), False)
+            cmd(["phyml", "--quiet", "-i", outPhy] + shlex.split(opt), False)
         except:
             logger.info(
                 "PhyML couldn't run with the provided info {}, running with default options.".format(
                     phymlOpt
                 )
             )
-            cmd("phyml --quiet -i {:s} -v e -b -2".format(outPhy), False)
+            cmd(("phyml", "--quiet", "-i", outPhy, "-v", "e", "-b", "-2"), False)
     else:
         logger.debug("phyml --quiet -i {:s} -v e -b -2".format(outPhy))
-        cmd("phyml --quiet -i {:s} -v e -b -2".format(outPhy), False)
+        cmd(("phyml", "--quiet", "-i", outPhy, "-v", "e", "-b", "-2"), False)
 
     return outPhy+"_phyml_tree.txt"
 
@@ -414,12 +494,27 @@ def runIqTree(parameters):
     aln = parameters["input"]
     queryName = parameters["queryName"]
 
-    cmd("iqtree --quiet -s {:s}".format(aln), False)
+    cmd(("iqtree", "--quiet", "-s", aln), False)
 
     return aln+".treefile"
 
 
 
+@lru_cache(maxsize=128)
+def loadTreeCached(path, mtime):
+    """
+    Function parsing a tree file, once per modification time of the file.
+
+    @param1 path: Path to the tree in Newick format
+    @param2 mtime: Modification time of the file, so that a rewritten tree is parsed again
+    @return (loadTree, nodes, dist): Tree, its nodes in postorder and their branch lengths
+    """
+    loadTree = ete3.Tree(path)
+    nodes = list(loadTree.traverse("postorder"))
+    dist = np.fromiter((node.dist for node in nodes), dtype=np.float64, count=len(nodes))
+    return loadTree, nodes, dist
+
+
 def cutLongBranches(parameters, aln, tree, nbSp, LBOpt, logger):
     """
     Check for overly long branches in a tree and separate both tree and corresponding alignment if found.
@@ -431,8 +526,7 @@ def cutLongBranches(parameters, aln, tree, nbSp, LBOpt, logger):
     """
 
     logger.info("Looking for long branches.")
-    loadTree = ete3.Tree(tree)
-    dist = [leaf.dist for leaf in loadTree.traverse()]
+    loadTree, nodes, dist = loadTreeCached(tree, os.path.getmtime(tree))
     # longDist = 500
     dAlnTree={}
 
@@ -444,20 +538,15 @@ def cutLongBranches(parameters, aln, tree, nbSp, LBOpt, logger):
             factor = float(LBOpt.split("(")[1].replace(")", ""))
         else:
             factor = 50
-        medianDist = median(dist)
-        meanDist = mean(dist)
-        longDist = meanDist * factor
+        longDist = dist.mean() * factor
     elif "IQR" in LBOpt:
         if "(" in LBOpt:
             factor = float(LBOpt.split("(")[1].replace(")", ""))
         else:
             factor = 50
-        df = pd.DataFrame(dist)
-        Q1 = df.quantile(0.25)
-        Q3 = df.quantile(0.75)
+        Q1, Q3 = np.quantile(dist, [0.25, 0.75])
         IQR = Q3 - Q1
-        lDist = Q3 + (factor * IQR)
-        longDist = lDist[0]
+        longDist = Q3 + (factor * IQR)
 
     logger.info(
         "Long branches will be evaluated through the {} method (factor {})".format(
@@ -465,14 +554,14 @@ def cutLongBranches(parameters, aln, tree, nbSp, LBOpt, logger):
         )
     )
     nbSp = int(nbSp)
-    matches = [leaf for leaf in loadTree.traverse("postorder") if leaf.dist > longDist]
+    matches = [node for node, d in zip(nodes, dist) if d > longDist]
     if len(matches) > 0:
         logger.info(
             "{} long branches found, separating alignments.".format(len(matches))
         )
 
-        seqs = SeqIO.parse(open(aln), "fasta")
-        dID2Seq = {gene.id: gene.seq for gene in seqs}
+        with open(aln) as f:
+            dID2Seq = {title.split()[0]: seq for title, seq in SimpleFastaParser(f)}
 
         for node in matches:
             gp = [node] + node.get_children()
@@ -488,9 +577,7 @@ def cutLongBranches(parameters, aln, tree, nbSp, LBOpt, logger):
             if len(dNewAln) > nbSp - 1:
               newQuery = queryName +  "_part" + str(matches.index(node) + 1)
               alnf = outdir + "/" + newQuery + "_sequences.fasta"
-              with open(alnf,"w") as fasta:
-                fasta.write(FastaResFunc.dict2fasta(dNewAln))
-                fasta.close()
+              FastaResFunc.dict2fastaFile(dNewAln, alnf)
               dAlnTree[newQuery] = alnf
             elif len(dNewAln)!=0:
                 logger.info(
@@ -503,10 +590,8 @@ def cutLongBranches(parameters, aln, tree, nbSp, LBOpt, logger):
         alnLeft = outdir + "/" + newQuery + "_sequences.fasta"
 
         if len(dID2Seq) > nbSp - 1:
-            with open(alnLeft, "w") as fasta:
-                fasta.write(FastaResFunc.dict2fasta(dID2Seq))
-                logger.info("\tNew alignment:%s" % {alnLeft})
-                fasta.close()
+            FastaResFunc.dict2fastaFile(dID2Seq, alnLeft)
+            logger.info("\tNew alignment:%s" % {alnLeft})
             dAlnTree[newQuery]=alnLeft
         elif len(dID2Seq)!=0:
             logger.info(
@@ -623,30 +708,32 @@ def parseGard(kh, parameters):
     queryName = parameters["queryName"]
     aln = parameters["input"]
     
-    lBP = []
-    f = open(kh, "r")
-    lLine = f.readline()
-    while lLine:
-        if lLine.find('breakpoints') != -1:
-            lLine = f.readline()
-            lLine = lLine[lLine.find("[") + 1 : lLine.find("]")]
-            if len(lLine)==0:
-              break
-            lBP = list(map(int, lLine.split(",")))
-            break
-        lLine = f.readline()
-    f.close()
+    with open(kh) as f:
+        gard = json.load(f)
+
+    if "breakpointData" in gard:
+        # GARD output: one entry per segment, each spanning "bps": [[start, end]]
+        lSeg = [gard["breakpointData"][k] for k in sorted(gard["breakpointData"], key=int)]
+        lBP = [int(seg["bps"][0][1]) for seg in lSeg[:-1]]
+    else:
+        lBP = [int(x) for x in gard.get("breakpoints", [])]
     index = 0
 
     # If there're breakpoint(s), cut sequence in subsequences according to breakpoints
     if len(lBP) > 0:
-        dFname2Fseq = {}
-        for fasta in SeqIO.parse(open(aln), "fasta"):
-            dFname2Fseq[fasta.id] = str(fasta.seq)
+        lName = []
+        lSeq = []
+        with open(aln) as f:
+            for title, seq in SimpleFastaParser(f):
+                lName.append(title.split()[0])
+                lSeq.append(seq.encode())
+
+        nbSeq = len(lName)
+        mat = np.frombuffer(b"".join(lSeq), dtype=np.uint8).reshape(nbSeq, -1)
+        lenSeq = mat.shape[1]
+        nogap = mat != ord("-")
 
         # looking for a multiple of 3 (number of letter) (subsequence ends on or after the breakpoint)
-        nbSeq = len(dFname2Fseq)
-        lenSeq = len(dFname2Fseq[list(dFname2Fseq.keys())[0]])
         lPos = [0]
         deb=0
         dFrag=[]
@@ -656,31 +743,24 @@ def parseGard(kh, parameters):
             while (bp-deb) % 3 != 0:
                 bp += 1
                 dec=True
-            nF={}
-            for  name,seq in dFname2Fseq.items():
-              nseq=seq[deb:bp]
-              if len(nseq.replace("-",""))!=0: # Non empty sequence
-                     nF[name]=nseq
-            dFrag.append(nF)
+            lKeep = np.flatnonzero(nogap[:, deb:bp].any(axis=1))  # Non empty sequences
+            dFrag.append({lName[i]: mat[i, deb:bp].tobytes().decode() for i in lKeep})
             deb=bp + [0,-3][dec]  # dec to reput codon if broken
             lPos.append(bp)
 
         # Adding subsequences that start at the last breakpoint to the end 
-        dFrag += [{name:seq[deb:] for  name,seq in dFname2Fseq.items()}]
+        dFrag += [{lName[i]: mat[i, deb:].tobytes().decode() for i in range(nbSeq)}]
 
         lBP = lPos + [lenSeq]
         lQuerFrag = []
         lOutFrag = []
         index = 0
-        for x in range(len(lBP)-1):
-            extension = "_{:d}-{:d}".format(lBP[x]+1, lBP[x+1])
-
-            name = queryName + extension
-            outFrag = outdir + "/" + name + "_orf.fasta"
-            
-            with open(outFrag, "w") as outF:
-                outF.write(FastaResFunc.dict2fasta(dFrag[x]))
-                outF.close()
+        prefix = os.path.join(outdir, queryName)
+        for frag, start, end in zip(dFrag, lBP[:-1], lBP[1:]):
+            name = f"{queryName}_{start + 1}-{end}"
+            outFrag = f"{prefix}_{start + 1}-{end}_orf.fasta"
+
+            FastaResFunc.dict2fastaFile(frag, outFrag)
             lQuerFrag.append(name)
             lOutFrag.append(outFrag)
         return [lQuerFrag, lOutFrag]
@@ -24,6 +24,18 @@ def dict2fasta(dico):
     return txtoutput
 
 
+def dict2fastaFile(dico, path):
+    """
+    Function writing a dictionary associating gene names to their sequences into a Fasta file, one record at a time.
+
+    @param1 dico: Dictionary associating gene names (keys) to their CCDS fasta sequence (values)
+    @param2 path: Path to the Fasta file to write
+    """
+
+    with open(path, "w") as out:
+        out.writelines(">{:s}\n{:s}\n".format(str(key), str(value)) for key, value in dico.items())
+
+
 
 def remoteDl(lBlastRes, queryName, apiKey):
 	"""
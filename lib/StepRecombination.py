@@ -2,6 +2,7 @@
 Script running the recombination analysis step.
 """
 
+import json
 import logging
 import os
 import subprocess
@@ -29,12 +30,11 @@ if __name__ == "__main__":
 
     # Run step (inactivated for now)
 
-    gardRes = os.path.join(config["outdir"],config["queryName"] + "_bp.txt")
+    gardRes = os.path.join(config["outdir"],config["queryName"] + "_bp.json")
     
     frec = open(gardRes, "w")
-    frec.write("breakpoints\n")
-#    frec.write("[500]\n")
-#    frec.write("[]\n")
+    json.dump({"breakpoints": []}, frec)
+#    json.dump({"breakpoints": [500]}, frec)
     frec.close()
 
     ## lQuer is the list of new queryNames